@@ -0,0 +1,6 @@
+# Root conftest so pytest puts the repo root on sys.path and tests can
+# import main; main.py requires these at import time.
+import os
+
+os.environ.setdefault("TOGETHER_API_KEY", "test-key")
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
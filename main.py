@@ -17,11 +17,13 @@ import aiohttp
 from typing import Optional
 from urllib.parse import quote_plus, unquote
 import asyncio
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from bson.objectid import ObjectId
 import random
 import json
 import re
+import zlib
+from collections import OrderedDict
 
 # Load environment variables
 load_dotenv()
@@ -30,6 +32,12 @@ load_dotenv()
 TOGETHER_API_KEY = os.getenv("TOGETHER_API_KEY")
 MONGODB_URI = os.getenv('MONGODB_URI')
 
+# Chat archival configuration
+CHAT_ARCHIVE_AFTER_DAYS = int(os.getenv("CHAT_ARCHIVE_AFTER_DAYS", "30"))
+CHAT_ARCHIVE_INTERVAL_SECONDS = int(os.getenv("CHAT_ARCHIVE_INTERVAL_SECONDS", "3600"))
+CHAT_ARCHIVE_BATCH_SIZE = int(os.getenv("CHAT_ARCHIVE_BATCH_SIZE", "200"))
+CHAT_ARCHIVE_CACHE_SIZE = int(os.getenv("CHAT_ARCHIVE_CACHE_SIZE", "128"))
+
 # Validate required environment variables
 if not TOGETHER_API_KEY:
     raise ValueError("TOGETHER_API_KEY not found in environment variables")
@@ -60,10 +68,124 @@ app.add_middleware(
 # Session storage (in-memory for simplicity)
 sessions = {}
 
+# Recently decompressed archived chats, keyed by chat id (LRU)
+archive_cache = OrderedDict()
+
+def compress_chat_payload(chat: dict) -> bytes:
+    payload = {
+        "messages": chat.get("messages", []),
+        "quiz_state": chat.get("quiz_state")
+    }
+    return zlib.compress(json.dumps(payload, default=str).encode("utf-8"))
+
+def decompress_chat_payload(data: bytes) -> dict:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+def build_chat_preview(messages) -> str:
+    if not messages:
+        return "Empty chat"
+    # Strip HTML tags for preview
+    preview = re.sub('<[^<]+?>', '', messages[0].get("content", ""))
+    return preview[:50] + "..." if len(preview) > 50 else preview
+
+def cache_archived_payload(chat_id: str, payload: dict):
+    archive_cache[chat_id] = payload
+    archive_cache.move_to_end(chat_id)
+    while len(archive_cache) > CHAT_ARCHIVE_CACHE_SIZE:
+        archive_cache.popitem(last=False)
+
+async def load_archived_payload(chat_id: str) -> Optional[dict]:
+    if chat_id in archive_cache:
+        archive_cache.move_to_end(chat_id)
+        return archive_cache[chat_id]
+
+    archived = await db.chat_archive.find_one({"_id": ObjectId(chat_id)})
+    if not archived:
+        return None
+
+    payload = decompress_chat_payload(archived["data"])
+    cache_archived_payload(chat_id, payload)
+    return payload
+
+async def restore_archived_chat(chat: dict) -> dict:
+    payload = await load_archived_payload(str(chat["_id"]))
+    if payload is not None:
+        chat["messages"] = payload.get("messages", [])
+        chat["quiz_state"] = payload.get("quiz_state")
+    return chat
+
+async def archive_old_chats() -> int:
+    cutoff = datetime.utcnow() - timedelta(days=CHAT_ARCHIVE_AFTER_DAYS)
+    cursor = db.chats.find({
+        # $exists: False matches the null key of the (archived, timestamp) index
+        "archived": {"$exists": False},
+        "timestamp": {"$lt": cutoff}
+    }).limit(CHAT_ARCHIVE_BATCH_SIZE)
+
+    archived_count = 0
+    async for chat in cursor:
+        messages = chat.get("messages") or []
+
+        # Write the compressed copy first so a failure never loses messages
+        await db.chat_archive.replace_one(
+            {"_id": chat["_id"]},
+            {
+                "_id": chat["_id"],
+                "user_id": chat.get("user_id"),
+                "data": compress_chat_payload(chat),
+                "archived_at": datetime.utcnow()
+            },
+            upsert=True
+        )
+
+        # Leave a lightweight stub in the hot collection
+        await db.chats.update_one(
+            {"_id": chat["_id"]},
+            {
+                "$set": {
+                    "archived": True,
+                    "preview": chat.get("preview") or build_chat_preview(messages),
+                    "message_count": len(messages)
+                },
+                "$unset": {"messages": "", "quiz_state": ""}
+            }
+        )
+        archived_count += 1
+
+    return archived_count
+
+async def run_chat_archiver():
+    while True:
+        try:
+            # Drain the backlog in batches before sleeping
+            total = 0
+            while True:
+                count = await archive_old_chats()
+                total += count
+                if count < CHAT_ARCHIVE_BATCH_SIZE:
+                    break
+            if total:
+                print(f"Archived {total} chats older than {CHAT_ARCHIVE_AFTER_DAYS} days")
+        except Exception as e:
+            print(f"Error archiving chats: {str(e)}")
+        await asyncio.sleep(CHAT_ARCHIVE_INTERVAL_SECONDS)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Index chat history and archival queries
+    try:
+        await db.chats.create_index([("user_id", 1), ("timestamp", -1)])
+        await db.chats.create_index([("archived", 1), ("timestamp", 1)])
+    except Exception as e:
+        print(f"Error creating chat indexes: {str(e)}")
+
+    # Start background archival of cold chats
+    archiver = asyncio.create_task(run_chat_archiver())
     yield
     # Cleanup on shutdown
+    archiver.cancel()
+    with suppress(asyncio.CancelledError):
+        await archiver
     if client:
         await client.close()
 
@@ -401,23 +523,33 @@ async def get_history(request: Request, current_user: dict = Depends(get_current
         user_id = str(current_user["_id"])
         print(f"Fetching history for user_id: {user_id}")
         
-        # Only get chats for this specific user
-        cursor = db.chats.find({"user_id": user_id}).sort("timestamp", -1)
+        # Only get chat summaries for this specific user; full transcripts
+        # are loaded on demand through /api/chat/{chat_id}
+        cursor = db.chats.find(
+            {"user_id": user_id},
+            {
+                "topic": 1,
+                "preview": 1,
+                "timestamp": 1,
+                "archived": 1,
+                "messages": {"$slice": 1}
+            }
+        ).sort("timestamp", -1)
         history = []
         
         async for chat in cursor:
-            # Convert ObjectId and timestamp for JSON
-            chat["_id"] = str(chat["_id"])
-            chat["timestamp"] = chat["timestamp"].strftime("%Y-%m-%d %H:%M:%S")
-            
-            # Get preview from first message
-            if chat.get("messages") and len(chat["messages"]) > 0:
-                preview = chat["messages"][0].get("content", "")[:50]
-                chat["preview"] = preview + "..." if len(preview) >= 50 else preview
-            else:
-                chat["preview"] = "Empty chat"
+            # Fall back to the first message for chats saved without a preview
+            first_message = chat.pop("messages", None)
+            if not chat.get("preview"):
+                chat["preview"] = build_chat_preview(first_message)
             
-            history.append(chat)
+            history.append({
+                "_id": str(chat["_id"]),
+                "topic": chat.get("topic"),
+                "preview": chat["preview"],
+                "timestamp": chat["timestamp"].strftime("%Y-%m-%d %H:%M:%S"),
+                "archived": chat.get("archived", False)
+            })
         
         # Get user's progress
         user = await db.users.find_one({"_id": ObjectId(user_id)})
@@ -522,6 +654,12 @@ async def get_chat(chat_id: str, current_user: dict = Depends(get_current_user))
         
         if not chat:
             return {"error": "Chat not found"}
+        
+        # Transparently restore archived chats from the archive collection
+        if chat.get("archived"):
+            chat = await restore_archived_chat(chat)
+            if "messages" not in chat:
+                return {"error": "Chat not found"}
             
         chat["_id"] = str(chat["_id"])
         chat["timestamp"] = chat["timestamp"].strftime("%Y-%m-%d %H:%M:%S")
@@ -548,14 +686,12 @@ async def save_chat(request: Request, current_user: dict = Depends(get_current_u
             "topic": data["topic"],
             "messages": data["messages"],  # Contains HTML content
             "quiz_state": data.get("quiz_state"),  # Save quiz state if present
-            "timestamp": datetime.now()
+            "timestamp": datetime.utcnow()
         }
         
         # Get preview from first message if available
         if chat["messages"] and len(chat["messages"]) > 0:
-            # Strip HTML tags for preview
-            preview = re.sub('<[^<]+?>', '', chat["messages"][0]["content"])
-            chat["preview"] = preview[:50] + "..." if len(preview) > 50 else preview
+            chat["preview"] = build_chat_preview(chat["messages"])
         
         # Save to MongoDB
         result = await db.chats.insert_one(chat)
@@ -585,13 +721,25 @@ async def get_chats(request: Request):
         
         # Get all chats for the user, sorted by timestamp descending
         cursor = db.chats.find({"user_id": user_id}).sort("timestamp", -1)
-        chats = []
-        
-        async for chat in cursor:
+        chats = await cursor.to_list(length=None)
+        
+        # Restore archived chats in one query so callers always get full
+        # transcripts; bypass the LRU, which is reserved for get_chat
+        archived_ids = [chat["_id"] for chat in chats if chat.get("archived")]
+        payloads = {}
+        if archived_ids:
+            async for archived in db.chat_archive.find({"_id": {"$in": archived_ids}}):
+                payloads[archived["_id"]] = decompress_chat_payload(archived["data"])
+        
+        for chat in chats:
+            payload = payloads.get(chat["_id"])
+            if payload is not None:
+                chat["messages"] = payload.get("messages", [])
+                chat["quiz_state"] = payload.get("quiz_state")
+            
             # Convert ObjectId and datetime to string
             chat["_id"] = str(chat["_id"])
             chat["timestamp"] = chat["timestamp"].strftime("%Y-%m-%d %H:%M:%S")
-            chats.append(chat)
         
         return {
             "success": True,
@@ -457,6 +457,15 @@ async function loadChat(chat) {
         // Clear current chat
         chatMessages.innerHTML = '';
         
+        // History entries are summaries; fetch the full transcript
+        const response = await fetch(`/api/chat/${chat._id}`, {
+            credentials: 'include'
+        });
+        if (!response.ok) throw new Error('Failed to load chat');
+        const fullChat = await response.json();
+        if (fullChat.error) throw new Error(fullChat.error);
+        chat = fullChat;
+
         // Set current topic and quiz state
         currentTopic = chat.topic;
         quizState = chat.quiz_state || null;
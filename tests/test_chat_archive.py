@@ -0,0 +1,208 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson.objectid import ObjectId
+
+import main
+
+
+def matches(doc, query):
+    for key, condition in query.items():
+        value = doc.get(key)
+        if isinstance(condition, dict):
+            if "$exists" in condition and (key in doc) != condition["$exists"]:
+                return False
+            if "$lt" in condition and not (key in doc and value < condition["$lt"]):
+                return False
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def limit(self, count):
+        self.docs = self.docs[:count]
+        return self
+
+    def sort(self, key, direction):
+        self.docs.sort(key=lambda doc: doc[key], reverse=direction < 0)
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs
+
+    def __aiter__(self):
+        self._iter = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeCollection:
+    def __init__(self, name, docs, log):
+        self.name = name
+        self.docs = docs
+        self.log = log
+
+    async def find_one(self, query, projection=None):
+        for doc in self.docs:
+            if matches(doc, query):
+                return dict(doc)
+        return None
+
+    def find(self, query, projection=None):
+        return FakeCursor([dict(doc) for doc in self.docs if matches(doc, query)])
+
+    async def replace_one(self, query, replacement, upsert=False):
+        self.log.append((self.name, "replace_one"))
+        self.docs[:] = [doc for doc in self.docs if not matches(doc, query)]
+        self.docs.append(dict(replacement))
+
+    async def update_one(self, query, update):
+        self.log.append((self.name, "update_one"))
+        for doc in self.docs:
+            if matches(doc, query):
+                doc.update(update.get("$set", {}))
+                for key in update.get("$unset", {}):
+                    doc.pop(key, None)
+                return
+
+
+class FakeDB:
+    def __init__(self, chats, chat_archive=None):
+        self.log = []
+        self.chats = FakeCollection("chats", chats, self.log)
+        self.chat_archive = FakeCollection("chat_archive", chat_archive or [], self.log)
+
+
+def make_chat(age_days, content="What is a perceptron?"):
+    return {
+        "_id": ObjectId(),
+        "user_id": "user-1",
+        "topic": "neural-networks",
+        "messages": [
+            {"content": f"<p>{content}</p>", "sender": "user"},
+            {"content": "A single-layer neural network.", "sender": "ai"}
+        ],
+        "quiz_state": {"question": 1},
+        "timestamp": datetime.utcnow() - timedelta(days=age_days)
+    }
+
+
+def setup_function():
+    main.archive_cache.clear()
+
+
+def test_compress_round_trip():
+    chat = {
+        "messages": [{"content": "<p>Hello</p>", "sender": "user"}],
+        "quiz_state": {"question": 2, "score": 1}
+    }
+
+    payload = main.decompress_chat_payload(main.compress_chat_payload(chat))
+
+    assert payload == {
+        "messages": chat["messages"],
+        "quiz_state": chat["quiz_state"]
+    }
+
+
+def test_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(main, "CHAT_ARCHIVE_CACHE_SIZE", 2)
+
+    main.cache_archived_payload("a", {"messages": []})
+    main.cache_archived_payload("b", {"messages": []})
+    # Touch "a" so "b" becomes the oldest entry
+    asyncio.run(main.load_archived_payload("a"))
+    main.cache_archived_payload("c", {"messages": []})
+
+    assert list(main.archive_cache) == ["a", "c"]
+
+
+def test_archive_old_chats_stubs_cold_chats(monkeypatch):
+    old_chat = make_chat(age_days=60)
+    new_chat = make_chat(age_days=1)
+    fake_db = FakeDB([dict(old_chat), dict(new_chat)])
+    monkeypatch.setattr(main, "db", fake_db)
+
+    assert asyncio.run(main.archive_old_chats()) == 1
+
+    # The compressed copy is written before the hot document is stripped
+    assert fake_db.log == [("chat_archive", "replace_one"), ("chats", "update_one")]
+
+    archived = fake_db.chat_archive.docs[0]
+    assert archived["_id"] == old_chat["_id"]
+    assert main.decompress_chat_payload(archived["data"]) == {
+        "messages": old_chat["messages"],
+        "quiz_state": old_chat["quiz_state"]
+    }
+
+    stub, untouched = fake_db.chats.docs
+    assert stub["archived"] is True
+    assert stub["preview"] == "What is a perceptron?"
+    assert stub["message_count"] == 2
+    assert "messages" not in stub
+    assert "quiz_state" not in stub
+    assert untouched == new_chat
+
+
+def test_archive_old_chats_skips_archived_chats(monkeypatch):
+    fake_db = FakeDB([make_chat(age_days=60)])
+    monkeypatch.setattr(main, "db", fake_db)
+
+    assert asyncio.run(main.archive_old_chats()) == 1
+    fake_db.log.clear()
+
+    assert asyncio.run(main.archive_old_chats()) == 0
+    assert fake_db.log == []
+
+
+def test_run_chat_archiver_drains_backlog_before_sleeping(monkeypatch):
+    fake_db = FakeDB([make_chat(age_days=60) for _ in range(5)])
+    monkeypatch.setattr(main, "db", fake_db)
+    monkeypatch.setattr(main, "CHAT_ARCHIVE_BATCH_SIZE", 2)
+
+    async def stop_sleep(seconds):
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(main.asyncio, "sleep", stop_sleep)
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(main.run_chat_archiver())
+
+    assert all(chat.get("archived") for chat in fake_db.chats.docs)
+
+
+def test_get_chat_restores_archived_chat(monkeypatch):
+    chat_id = ObjectId()
+    messages = [{"content": "What is a perceptron?", "sender": "user"}]
+    stub = {
+        "_id": chat_id,
+        "user_id": "user-1",
+        "topic": "neural-networks",
+        "preview": "What is a perceptron?",
+        "archived": True,
+        "timestamp": datetime(2024, 1, 1)
+    }
+    archived = {
+        "_id": chat_id,
+        "user_id": "user-1",
+        "data": main.compress_chat_payload({"messages": messages, "quiz_state": None})
+    }
+    monkeypatch.setattr(main, "db", FakeDB([stub], [archived]))
+
+    chat = asyncio.run(main.get_chat(str(chat_id), current_user={"_id": "user-1"}))
+
+    assert chat["messages"] == messages
+    assert chat["quiz_state"] is None
+    assert str(chat_id) in main.archive_cache